@@ -16,6 +16,7 @@ def main():
     Console Script for <OPENDOTA/> API
     Powered by `python-fire`
     """
+    # imported here, so that library users do not pay for importing `fire`
     import fire
     fire.Fire(OpenDota)
     return 0
@@ -29,23 +29,232 @@ Features
 """
 
 import os
+import re
+import mmap
+import inspect
 import time
+import sqlite3
 import json
 import logging
+import itertools
+import threading
 from typing import Any, List
-from urllib.parse import urlsplit, urlunsplit
+from collections import OrderedDict
+from operator import itemgetter
+from fnmatch import fnmatchcase
+from functools import wraps
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+###############################################################################
+
+__all__ = [
+    'OpenDota',
+    'OPENDOTA_API_URL', 'TIMEOUT',
+    'CACHE_FILE', 'CACHE_SQLITE', 'CACHE_SQLITE_FILENAME',
+    'MEMORY_CACHE_SIZE', 'MEMORY_CACHE_BYTES',
+    'CACHE_TTL', 'EVICTION_INTERVAL', 'COMPRESSION_LEVEL',
+    'POOL_SIZE', 'MAX_RETRIES', 'RETRY_BACKOFF', 'RETRY_STATUS',
+    'MAX_WORKERS', 'MAX_WORKERS_FREE', 'RATE_LIMIT_FREE', 'RATE_LIMIT_PREMIUM',
+    'BURST_SIZE',
+    'FREQ_LOW', 'FREQ_MEDIUM', 'FREQ_HIGH',
+    'FANTASY', 'FANTASY_RECOMMENDED',
+]
 
 ###############################################################################
 
 LOGGER = logging.getLogger(__name__)
 
+###############################################################################
+# JSON (De)Serialization
+# `orjson` (or else `msgspec`) is used if available, falling back to the
+# standard `json` module.
+# Both operate on UTF-8 encoded bytes.
+
+
+def _loads(content: bytes) -> Any:
+    """Deserialize UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(content)
+    if msgspec is not None:
+        return msgspec.json.decode(content)
+    return json.loads(content)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a python object as UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if msgspec is not None:
+        return msgspec.json.encode(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _decompress(content: bytes) -> bytes:
+    """Decompress zstd compressed content, other content is returned as-is"""
+    if content[:4] == _ZSTD_MAGIC:
+        return zstandard.decompress(content)
+    return content
+
+
+def _write_file(path: str, content: bytes):
+    """
+    Write content to a file atomically
+
+    The content is written to a temporary file which then replaces `path`,
+    so that a concurrent reader never sees a partially written file.
+    """
+    temp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    try:
+        fd = os.open(temp_path, flags, 0o666)
+        try:
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _load_file(path: str) -> tuple:
+    """
+    Load a JSON file, returning its content and its size (in bytes of JSON)
+
+    Small files are read in a single call. Larger files are memory-mapped
+    and parsed in-place, if `orjson` or `msgspec` is available.
+    Compressed files are decompressed first.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size < _MMAP_THRESHOLD or (orjson is None and msgspec is None):
+            content = _decompress(os.read(fd, size))
+            return _loads(content), len(content)
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as content:
+                content = _decompress(content)
+                return _loads(content), len(content)
+    finally:
+        os.close(fd)
+
+
+def _group_heroes(heroes: list) -> tuple:
+    """Group positions of heroes by attack type and by role"""
+    by_attack_type, by_role = {}, {}
+    for position, hero in enumerate(heroes):
+        by_attack_type.setdefault(hero["attack_type"], set()).add(position)
+        for role in hero["roles"]:
+            by_role.setdefault(role, set()).add(position)
+    return by_attack_type, by_role
+
+
+def _group_schema(schema: list) -> dict:
+    """Group the columns (and their data types) of the schema by table"""
+    tables = {}
+    for column in schema:
+        columns = tables.setdefault(column["table_name"], {})
+        columns[column["column_name"]] = column["data_type"]
+    return tables
+
+
 ###############################################################################
 
 OPENDOTA_API_URL = "https://api.opendota.com/api"
 
+# Timeout in seconds for a single API call
+TIMEOUT = 30
+
+# Storage for previously fetched data
+CACHE_FILE = "file"
+CACHE_SQLITE = "sqlite"
+CACHE_SQLITE_FILENAME = "cache.sqlite"
+
+# Number of parsed responses kept in memory (by default),
+# and their maximum total size (in bytes of JSON)
+MEMORY_CACHE_SIZE = 256
+MEMORY_CACHE_BYTES = 16 << 20
+
+# Maximum age (in seconds) of previously fetched data, by filename pattern
+# Stale data is fetched again (using a conditional request), and is still
+# used if the API call fails.
+# Data not matching any pattern (e.g. matches) does not expire.
+CACHE_TTL = {
+    "pro_matches.json": 5 * 60,
+    "teams.json": 24 * 60 * 60,
+    "leagues.json": 24 * 60 * 60,
+    "pro_players.json": 24 * 60 * 60,
+    "hero_stats.json": 24 * 60 * 60,
+    "benchmarks_*.json": 24 * 60 * 60,
+    "heroes.json": 7 * 24 * 60 * 60,
+    "constants*.json": 30 * 24 * 60 * 60,
+    "schema.json": 30 * 24 * 60 * 60,
+}
+
+# Number of writes between two checks of the size of the data directory
+EVICTION_INTERVAL = 100
+_CACHE_SUFFIXES = (".json", ".json.meta", ".json.zst", ".json.zst.meta")
+
+# zstd compression level of the stored data (if compression is enabled)
+COMPRESSION_LEVEL = 3
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Stored files of this size (in bytes) or larger are memory-mapped
+_MMAP_THRESHOLD = 1 << 20
+
+###############################################################################
+# Connection Pool
+
+# Maximum number of concurrent workers for bulk calls
+# (without an API key, calls are limited to a few per second anyway)
+MAX_WORKERS = 16
+MAX_WORKERS_FREE = 4
+
+# All API calls go to a single host, so a single pool of connections,
+# one per concurrent worker, is sufficient
+POOL_SIZE = MAX_WORKERS
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+###############################################################################
+# Rate Limits (calls per minute)
+
+RATE_LIMIT_FREE = 60
+RATE_LIMIT_PREMIUM = 1200
+
+# Number of calls that may be made at once, before throttling sets in
+BURST_SIZE = 4
+
 ###############################################################################
 
 FREQ_LOW = 10
@@ -98,6 +307,264 @@ FANTASY_RECOMMENDED = {
     'first_blood': 2
 }
 
+# Fantasy parameters, and how to extract their values from player data
+_STAT_EXTRACTORS = (
+    ('kills', itemgetter('kills')),
+    ('deaths', itemgetter('deaths')),
+    ('assists', itemgetter('assists')),
+    ('last_hits', lambda player: player['last_hits'] + player['denies']),
+    ('gold_per_min', itemgetter('gold_per_min')),
+    ('xp_per_min', itemgetter('xp_per_min')),
+    ('tower_kills', itemgetter('tower_kills')),
+    ('tower_damage', itemgetter('tower_damage')),
+    ('hero_damage', itemgetter('hero_damage')),
+    ('courier_kills', itemgetter('courier_kills')),
+    ('observer_kills', itemgetter('observer_kills')),
+    ('sentry_kills', itemgetter('sentry_kills')),
+    ('roshan_kills', itemgetter('roshan_kills')),
+    ('teamfight', itemgetter('teamfight_participation')),
+    ('observer_placed', itemgetter('obs_placed')),
+    ('sentry_placed', itemgetter('sen_placed')),
+    ('camps_stacked', itemgetter('camps_stacked')),
+    ('runes_grabbed', itemgetter('rune_pickups')),
+    ('first_blood', lambda player: int(player['firstblood_claimed'])),
+    ('stuns', itemgetter('stuns')),
+    ('hero_healing', itemgetter('hero_healing')),
+)
+
+# Match and player fields used to compute fantasy points
+_FANTASY_MATCH_FIELDS = (
+    'match_id', 'series_id', 'series_type',
+    'radiant_win', 'radiant_team', 'dire_team',
+)
+_FANTASY_PLAYER_FIELDS = (
+    'account_id', 'player_slot', 'hero_id', 'name',
+    'kills', 'deaths', 'assists', 'last_hits', 'denies',
+    'gold_per_min', 'xp_per_min', 'tower_kills', 'tower_damage',
+    'hero_damage', 'courier_kills', 'observer_kills', 'sentry_kills',
+    'roshan_kills', 'teamfight_participation', 'obs_placed', 'sen_placed',
+    'camps_stacked', 'rune_pickups', 'firstblood_claimed', 'stuns',
+    'hero_healing',
+)
+
+# Stored data derived from other stored data (the fantasy fields of a match,
+# and a marker that the per-team data has been stored from the list of teams),
+# which is removed whenever the latter is written again
+_FANTASY_FILENAME = "match_{}_fantasy.json"
+_TEAMS_STORED_FILENAME = "teams_stored.json"
+_DERIVED_FILENAMES = (
+    (re.compile(r"match_(\d+)\.json"), _FANTASY_FILENAME),
+    (re.compile(r"teams\.json"), _TEAMS_STORED_FILENAME),
+)
+
+###############################################################################
+
+
+@dataclass
+class _TokenBucket:
+    """
+    Token Bucket Rate Limiter
+
+    Tokens are refilled continuously at :code:`rate` tokens per second,
+    up to :code:`capacity`. Each API call consumes a token, and waits only
+    if the bucket is empty.
+    """
+
+    capacity: float
+    rate: float
+    tokens: float = None
+    last_refill: float = field(default_factory=time.monotonic)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        if self.tokens is None:
+            self.tokens = self.capacity
+
+    def acquire(self, n: int = 1):
+        """Consume `n` tokens, waiting for a refill if necessary"""
+        # tokens are reserved under the lock (possibly going into debt),
+        # and the wait for the refill happens outside of it
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self.last_refill) * self.rate
+            self.tokens = min(self.capacity, self.tokens + refill)
+            self.last_refill = now
+            self.tokens -= n
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self):
+        """Drain the bucket (e.g. after the API limit was hit)"""
+        with self._lock:
+            self.tokens = min(self.tokens, -self.rate)
+
+###############################################################################
+
+
+@dataclass
+class _SQLiteCache:
+    """
+    SQLite Key-Value Store
+
+    Stores the previously fetched data in a single SQLite database,
+    instead of a separate JSON file per API call.
+    JSON files already present in the same directory are imported when the
+    database is created.
+    """
+
+    path: str
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        migrate = not os.path.isfile(self.path)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "k TEXT PRIMARY KEY, mtime REAL, "
+            "etag TEXT, last_modified TEXT, val BLOB)"
+        )
+        if migrate:
+            self._migrate(os.path.dirname(self.path))
+
+    def _migrate(self, data_dir: str):
+        """Import the JSON files in `data_dir`"""
+        rows = []
+        for entry in os.scandir(data_dir):
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            with open(entry.path, "rb") as f:
+                content = f.read()
+            meta = {}
+            try:
+                with open(f"{entry.path}.meta", "rb") as f:
+                    meta = _loads(f.read())
+            except Exception:
+                pass
+            rows.append((
+                entry.name, entry.stat().st_mtime,
+                meta.get("etag"), meta.get("last_modified"), content
+            ))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?, ?)", rows
+            )
+        LOGGER.info("Imported %d files into '%s'.", len(rows), self.path)
+
+    def load(self, key: str) -> tuple:
+        """Get (content, mtime) stored for `key`, or None"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT val, mtime FROM kv WHERE k = ?", (key,)
+            ).fetchone()
+
+    def mtime(self, key: str) -> float:
+        """Get the time `key` was stored, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime FROM kv WHERE k = ?", (key,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def load_meta(self, key: str) -> dict:
+        """Get validators (ETag, Last-Modified) stored for `key`"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM kv WHERE k = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return {}
+        return {"etag": row[0], "last_modified": row[1]}
+
+    def save(
+        self,
+        key: str,
+        content: bytes,
+        etag: str = None,
+        last_modified: str = None
+    ):
+        """Store `content` for `key`"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?, ?)",
+                (key, time.time(), etag, last_modified, content)
+            )
+
+    def save_many(self, items: List[tuple]):
+        """Store (key, content) pairs in a single transaction"""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, NULL, NULL, ?)",
+                [(key, now, content) for key, content in items]
+            )
+
+    def delete(self, key: str):
+        """Remove `key`"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM kv WHERE k = ?", (key,))
+
+    def touch(self, key: str):
+        """Mark `key` as stored just now"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE kv SET mtime = ? WHERE k = ?", (time.time(), key)
+            )
+
+    def evict(self, max_bytes: int) -> int:
+        """Remove the oldest entries, until under `max_bytes`"""
+        with self._lock, self._db:
+            rows = self._db.execute(
+                "SELECT k, length(val) FROM kv ORDER BY mtime DESC"
+            ).fetchall()
+            total = 0
+            keys = []
+            for key, size in rows:
+                total += size or 0
+                if total > max_bytes:
+                    keys.append((key,))
+            self._db.executemany("DELETE FROM kv WHERE k = ?", keys)
+        return len(keys)
+
+
+@dataclass
+class _InFlight:
+    """API call in progress, shared by concurrent identical requests"""
+
+    event: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException = None
+
+
+def _cached_endpoint(url: str, filename: str):
+    """
+    Make a method fetch data from an API endpoint, and store it
+
+    `url` and `filename` are formatted with the arguments of the method,
+    e.g. :code:`"/teams/{team_id}"`. The body of the method is not called.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            return self.get(
+                url.format(**arguments),
+                filename=filename.format(**arguments),
+                force=arguments.get("force", False)
+            )
+        return wrapper
+    return decorator
+
 ###############################################################################
 
 
@@ -112,6 +579,10 @@ class OpenDota:
     All methods take a boolean argument :code:`force` which, if True,
     will fetch the data again even if it is available in the data directory.
 
+    Results are kept in memory and the same object is returned by repeated
+    calls, so results must not be modified in-place. Use
+    :code:`copy.deepcopy` on a result before modifying it.
+
     Parameters
     ----------
         data_dir: str, (optional)
@@ -121,7 +592,9 @@ class OpenDota:
             If you have an OpenDota API key
             The default is None.
         delay: int, (optional)
-            Delay in seconds between two consecutive API calls.
+            Average delay in seconds between two consecutive API calls.
+            Calls are throttled using a token bucket, so short bursts of
+            up to :code:`BURST_SIZE` calls are made without waiting.
             It is recommended to keep this at least 3 seconds, to
             prevent hitting the daily API limit.
             If you have an API key, this value is ignored.
@@ -142,6 +615,41 @@ class OpenDota:
         api_url: str, (optional)
             URL to OpenDota API.
             It is recommended to not change this value.
+        timeout: float, (optional)
+            Timeout in seconds for a single API call.
+            The default is 30.
+        cache: str, (optional)
+            Storage for the previously fetched data.
+            Utility constants CACHE_FILE and CACHE_SQLITE can be used.
+            If CACHE_FILE, every response is stored as a JSON file in
+            :code:`data_dir`.
+            If CACHE_SQLITE, all responses are stored in a single
+            SQLite database :code:`cache.sqlite` in :code:`data_dir`,
+            and existing JSON files are imported on first use.
+            The default is CACHE_FILE.
+        http2: bool, (optional)
+            Use HTTP/2, so that concurrent API calls are multiplexed over
+            a single connection.
+            Requires :code:`httpx` with HTTP/2 support
+            (:code:`pip install httpx[http2]`).
+            The default is False.
+        max_cache_size: int, (optional)
+            Maximum size in bytes of the stored data.
+            If exceeded, the least recently fetched data is removed.
+            The size is checked every :code:`EVICTION_INTERVAL` writes.
+            The default is None (no limit).
+        compress: bool, (optional)
+            Store the fetched data compressed with zstd.
+            With CACHE_FILE, the files are stored as :code:`.json.zst`,
+            and previously stored files are compressed when first read.
+            Requires :code:`zstandard`.
+            The default is False.
+        memory_cache_size: int, (optional)
+            Number of parsed responses kept in memory, so that stored data
+            is not read and parsed again. Their total size is limited to
+            :code:`MEMORY_CACHE_BYTES`, and larger responses are not kept.
+            If 0, nothing is kept in memory.
+            The default is 256.
     """
 
     data_dir: str = field(default=None)
@@ -149,9 +657,26 @@ class OpenDota:
     delay: int = field(default=3, repr=False)
     fantasy: dict = field(default=None, repr=False)
     api_url: str = field(default=OPENDOTA_API_URL, repr=False)
+    timeout: float = field(default=TIMEOUT, repr=False)
+    cache: str = field(default=CACHE_FILE, repr=False)
+    http2: bool = field(default=False, repr=False)
+    max_cache_size: int = field(default=None, repr=False)
+    compress: bool = field(default=False, repr=False)
+    memory_cache_size: int = field(default=MEMORY_CACHE_SIZE, repr=False)
 
     def __post_init__(self):
-        self._session = requests.Session()
+        # API paths are appended as-is, e.g. `/heroes`
+        self.api_url = self.api_url.rstrip("/")
+        self._session = self._create_session()
+
+        if self.api_key is None:
+            rate = 1 / max(self.delay, 60 / RATE_LIMIT_FREE)
+            self._max_workers = MAX_WORKERS_FREE
+        else:
+            rate = RATE_LIMIT_PREMIUM / 60
+            self._max_workers = MAX_WORKERS
+        # the burst does not grow with the delay
+        self._bucket = _TokenBucket(capacity=BURST_SIZE, rate=rate)
         if self.api_key is not None:
             self._session.headers['Authorization'] = f'Bearer {self.api_key}'
 
@@ -159,11 +684,78 @@ class OpenDota:
             self.data_dir = os.path.join(os.path.expanduser("~"), "dota2")
         os.makedirs(self.data_dir, exist_ok=True)
 
+        if self.cache == CACHE_FILE:
+            self._db = None
+        elif self.cache == CACHE_SQLITE:
+            self._db = _SQLiteCache(
+                os.path.join(self.data_dir, CACHE_SQLITE_FILENAME)
+            )
+        else:
+            raise ValueError(f"Invalid cache type: '{self.cache}'")
+
+        if self.compress and zstandard is None:
+            LOGGER.warning("Compression requires `zstandard`, disabled.")
+            self.compress = False
+
         default_fantasy = FANTASY.copy()
         if self.fantasy is not None:
             default_fantasy.update(self.fantasy)
         self.fantasy = default_fantasy
 
+        self._writes = itertools.count(1)
+        self._eviction_lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._memory_lock = threading.Lock()
+        self._derived = {}
+        self._constant_names = None
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def _create_session(self):
+        """
+        Create the HTTP session shared by all API calls
+
+        Returns an :code:`httpx.Client` if HTTP/2 is requested and available,
+        and a :code:`requests.Session` otherwise.
+        Both expose the same :code:`get()` and :code:`post()` interface.
+        """
+        if self.http2:
+            if httpx is None:
+                LOGGER.warning("HTTP/2 requires `httpx`, using HTTP/1.1.")
+            else:
+                try:
+                    transport = httpx.HTTPTransport(
+                        http2=True,
+                        retries=MAX_RETRIES,
+                        limits=httpx.Limits(
+                            max_connections=POOL_SIZE,
+                            max_keepalive_connections=POOL_SIZE
+                        )
+                    )
+                    return httpx.Client(transport=transport)
+                except ImportError:
+                    LOGGER.warning("HTTP/2 requires `h2`, using HTTP/1.1.")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=POOL_SIZE,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUS,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # advertise every content-encoding urllib3 can decode
+        # (brotli and zstd, if the optional packages are installed)
+        session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        return session
+
     # ----------------------------------------------------------------------- #
 
     def request(
@@ -173,7 +765,9 @@ class OpenDota:
         post: bool = False,
         data: dict = None,
         filename: str = None,
-        force: bool = False
+        force: bool = False,
+        ttl: float = None,
+        parse: bool = True
     ) -> Any:
         """
         Make a GET or POST request to <OPENDOTA/> API
@@ -193,57 +787,204 @@ class OpenDota:
                 The default is None.
             force: bool, (optional)
                 Force-fetch and overwrite data.
+                If the data was fetched before, a conditional request
+                is made, and the stored data is used if it has not been
+                modified since.
                 The default is False.
+            ttl: float, (optional)
+                Maximum age (in seconds) of previously fetched data.
+                Older data is fetched again, and is still used if the
+                API call fails.
+                The default is None (as per CACHE_TTL).
+            parse: bool, (optional)
+                Deserialize the result.
+                If False, the response is only stored in :code:`filename`
+                without being deserialized, and None is returned.
+                The default is True.
 
         Returns
         -------
             object:
                 Result of the API call deserialized as a python object
+                Previously fetched data is shared between calls,
+                and should not be modified in-place.
         """
-        path = None
-        if filename is not None:
-            path = os.path.join(self.data_dir, filename)
-            if not force and os.path.isfile(path):
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        json_data = json.load(f)
+        if filename is not None and not force:
+            if ttl is None:
+                ttl = self._default_ttl(filename)
+            if not parse:
+                # stored data is only checked for its age, not parsed
+                mtime = self._cache_mtime(filename)
+                fresh = mtime is not None and (
+                    ttl is None or time.time() - mtime <= ttl
+                )
+                if fresh:
+                    LOGGER.info("'%s' was fetched before.", filename)
+                    return None
+                stale = mtime is not None
+            else:
+                json_data = self._read_cache(filename, ttl=ttl)
+                if json_data is not None:
                     LOGGER.info(
-                        f"Loading previously fetched data from '{filename}'."
+                        "Loading previously fetched data from '%s'.",
+                        filename
                     )
                     return json_data
-                except Exception:
-                    pass
-
-        data = data or {}
-        if self.api_key is None:
-            time.sleep(self.delay)
+                stale = ttl is not None and self._is_cached(filename)
         else:
-            data["api_key"] = self.api_key
+            stale = False
 
-        url_parts = list(urlsplit(self.api_url))
-        url_parts[2] += url
-        if not post:
-            url_parts[3] = "&".join([f"{k}={v}" for k, v in data.items()])
+        # expired data is still used if it can not be fetched again
+        try:
+            json_data = self._shared_request(
+                url, post=post, data=data, filename=filename,
+                force=force, parse=parse
+            )
+        except Exception as e:
+            if not stale:
+                raise
+            LOGGER.warning("Could not fetch '%s' (%s).", url, e)
+            json_data = None
+        if stale and parse and json_data is None:
+            LOGGER.info("Loading expired data from '%s'.", filename)
+            return self._read_cache(filename)
+        return json_data
 
-        query_url = urlunsplit(url_parts)
-        LOGGER.info(f"Query URL: {query_url}")
+    def _shared_request(
+        self,
+        url: str,
+        *,
+        post: bool = False,
+        data: dict = None,
+        filename: str = None,
+        force: bool = False,
+        parse: bool = True
+    ) -> Any:
+        """Make an API call, shared by concurrent identical GET requests"""
+        try:
+            key = (url, filename, parse, tuple(sorted((data or {}).items())))
+            hash(key)
+        except TypeError:
+            key = None
+        if post or key is None:
+            return self._request(
+                url, post=post, data=data, filename=filename,
+                force=force, parse=parse
+            )
 
-        if not post:
-            r = self._session.get(query_url)
-        else:
-            r = self._session.post(query_url, data=data)
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._request(
+                url, data=data, filename=filename, force=force, parse=parse
+            )
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight.event.set()
+        return flight.result
+
+    def _request(
+        self,
+        url: str,
+        *,
+        post: bool = False,
+        data: dict = None,
+        filename: str = None,
+        force: bool = False,
+        parse: bool = True
+    ) -> Any:
+        """Make an API call, and store the result in `filename`"""
+        # validators (ETag, Last-Modified) of previously fetched data
+        headers = {}
+        if filename is not None and not post:
+            meta = self._read_cache_meta(filename)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        r = self._fetch(url, post=post, data=data, headers=headers)
+        if r.status_code == 304:
+            if parse:
+                json_data = self._read_cache(filename)
+                found = json_data is not None
+            else:
+                json_data = None
+                found = self._is_cached(filename)
+            if found:
+                LOGGER.info("'%s' has not been modified.", filename)
+                self._touch_cache(filename)
+                return json_data
+
+            # stored data has gone missing since the request was made
+            r = self._fetch(url, data=data)
+
+        content = r.content
+        # the response is deserialized, unless it is only to be stored
+        json_data = None
+        if parse or filename is None or r.status_code != 200:
+            json_data = _loads(content)
+            error = None
+            if isinstance(json_data, dict):
+                error = json_data.get("error")
+            if error is not None:
+                LOGGER.warning("Could not fetch '%s' (%s).", url, error)
+                return None
 
-        content = r.content.decode("utf-8")
-        json_data = json.loads(content)
+        if filename is not None:
+            self._write_cache(
+                filename,
+                content,
+                etag=r.headers.get("ETag"),
+                last_modified=r.headers.get("Last-Modified")
+            )
+            if parse:
+                self._remember(filename, json_data, time.time(), len(content))
+        return json_data if parse else None
 
-        if json_data and "error" in json_data:
-            LOGGER.warning(f"Could not fetch '{url}' ({json_data['error']}).")
-            return None
+    def _fetch(
+        self,
+        url: str,
+        *,
+        post: bool = False,
+        data: dict = None,
+        headers: dict = None
+    ):
+        """Make a rate-limited GET or POST request and return the response"""
+        # copy, so that the caller's dict is never modified
+        data = {} if data is None else dict(data)
+        if self.api_key is not None:
+            data["api_key"] = self.api_key
 
-        if path is not None:
-            with open(path, "w", encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False)
-        return json_data
+        query_url = self.api_url + url
+        LOGGER.info("Query URL: %s", query_url)
+
+        self._bucket.acquire()
+        if not post:
+            r = self._session.get(
+                query_url, params=data, headers=headers, timeout=self.timeout
+            )
+        else:
+            r = self._session.post(
+                query_url, data=data, timeout=self.timeout
+            )
+
+        if r.status_code == 429:
+            self._bucket.penalize()
+        return r
 
     def get(self, *args, **kwargs):
         """
@@ -263,12 +1004,312 @@ class OpenDota:
         kwargs['post'] = True
         return self.request(*args, **kwargs)
 
+    def _fetch_many(self, specs: List[tuple], force: bool = False) -> list:
+        """
+        Make several GET requests concurrently
+
+        Parameters
+        ----------
+            specs: list
+                List of (url, filename, data) tuples
+            force: bool, (optional)
+                Force-fetch and overwrite data.
+                The default is False.
+
+        Returns
+        -------
+            list:
+                Results of the API calls, in the order of `specs`
+        """
+        def fetch(spec):
+            url, filename, data = spec
+            return self.get(url, filename=filename, data=data, force=force)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return list(executor.map(fetch, specs))
+
+    # ----------------------------------------------------------------------- #
+    # Cache
+
+    def _default_ttl(self, filename: str) -> float:
+        """Get the maximum age of `filename` from CACHE_TTL, or None"""
+        ttl = CACHE_TTL.get(filename)
+        if ttl is None:
+            for pattern, pattern_ttl in CACHE_TTL.items():
+                if fnmatchcase(filename, pattern):
+                    return pattern_ttl
+        return ttl
+
+    def _read_cache(self, filename: str, ttl: float = None) -> Any:
+        """Get previously fetched data, or None if unavailable (or stale)"""
+        with self._memory_lock:
+            entry = self._memory.get(filename)
+            if entry is not None:
+                self._memory.move_to_end(filename)
+
+        if entry is None:
+            try:
+                if self._db is not None:
+                    row = self._db.load(filename)
+                    if row is None:
+                        return None
+                    content, mtime = row
+                    content = _decompress(content)
+                    entry = (_loads(content), mtime, len(content))
+                else:
+                    path = self._cache_path(filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        if not self._compress_file(filename):
+                            return None
+                        stat = os.stat(path)
+                    json_data, size = _load_file(path)
+                    entry = (json_data, stat.st_mtime, size)
+            except Exception:
+                return None
+            self._remember(filename, *entry)
+
+        json_data, mtime, _ = entry
+        if ttl is not None and time.time() - mtime > ttl:
+            return None
+        return json_data
+
+    def _remember(
+        self,
+        filename: str,
+        json_data: Any,
+        mtime: float,
+        size: int
+    ):
+        """Keep parsed data in memory, evicting the least recently used"""
+        if size > MEMORY_CACHE_BYTES or self.memory_cache_size <= 0:
+            return
+        self._forget(filename)
+        with self._memory_lock:
+            self._memory[filename] = (json_data, mtime, size)
+            self._memory_bytes += size
+            while (
+                len(self._memory) > self.memory_cache_size
+                or self._memory_bytes > MEMORY_CACHE_BYTES
+            ):
+                _, (_, _, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def _forget(self, filename: str):
+        """Drop parsed data from memory"""
+        with self._memory_lock:
+            entry = self._memory.pop(filename, None)
+            if entry is not None:
+                self._memory_bytes -= entry[2]
+
+    def _cache_path(self, filename: str) -> str:
+        """Get the path of the file storing data fetched as `filename`"""
+        path = os.path.join(self.data_dir, filename)
+        return f"{path}.zst" if self.compress else path
+
+    def _compress_file(self, filename: str) -> bool:
+        """
+        Compress data that was stored before compression was enabled
+
+        Returns True if an uncompressed file was found (and replaced).
+        """
+        if not self.compress:
+            return False
+        path = os.path.join(self.data_dir, filename)
+        try:
+            stat = os.stat(path)
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            return False
+
+        compressed_path = self._cache_path(filename)
+        _write_file(
+            compressed_path, zstandard.compress(content, COMPRESSION_LEVEL)
+        )
+        # keep the time the data was fetched
+        os.utime(compressed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        try:
+            if os.path.isfile(f"{path}.meta"):
+                os.replace(f"{path}.meta", f"{compressed_path}.meta")
+            os.remove(path)
+        except OSError:
+            pass
+        LOGGER.info("Compressed previously fetched data '%s'.", filename)
+        return True
+
+    def _cache_mtime(self, filename: str) -> float:
+        """Get the time data was fetched, or None if unavailable"""
+        if self._db is not None:
+            return self._db.mtime(filename)
+        try:
+            return os.stat(self._cache_path(filename)).st_mtime
+        except OSError:
+            return None
+
+    def _is_cached(self, filename: str) -> bool:
+        """Check if data has been fetched previously"""
+        return self._cache_mtime(filename) is not None
+
+    def _read_cache_meta(self, filename: str) -> dict:
+        """Get validators (ETag, Last-Modified) of previously fetched data"""
+        if self._db is not None:
+            return self._db.load_meta(filename)
+
+        path = self._cache_path(filename)
+        if not os.path.isfile(path):
+            return {}
+        try:
+            with open(f"{path}.meta", "rb") as f:
+                return _loads(f.read())
+        except Exception:
+            return {}
+
+    def _write_cache(
+        self,
+        filename: str,
+        content: bytes,
+        etag: str = None,
+        last_modified: str = None
+    ):
+        """Store fetched data (and its validators)"""
+        self._forget(filename)
+
+        if self.compress:
+            content = zstandard.compress(content, COMPRESSION_LEVEL)
+
+        if self._db is not None:
+            self._db.save(filename, content, etag, last_modified)
+        else:
+            path = self._cache_path(filename)
+            _write_file(path, content)
+            if etag or last_modified:
+                meta = {"etag": etag, "last_modified": last_modified}
+                _write_file(f"{path}.meta", _dumps(meta))
+            else:
+                # validators of older content do not apply anymore
+                try:
+                    os.remove(f"{path}.meta")
+                except FileNotFoundError:
+                    pass
+        self._remove_derived(filename)
+
+        if (
+            self.max_cache_size is not None
+            and next(self._writes) % EVICTION_INTERVAL == 0
+        ):
+            self._evict_cache(self.max_cache_size)
+
+    def _write_cache_many(self, items: List[tuple]):
+        """Store several (filename, content) pairs of fetched data"""
+        if self._db is None:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                list(executor.map(lambda i: self._write_cache(*i), items))
+            return
+
+        for filename, _ in items:
+            self._forget(filename)
+        if self.compress:
+            items = [
+                (filename, zstandard.compress(content, COMPRESSION_LEVEL))
+                for filename, content in items
+            ]
+        self._db.save_many(items)
+        for filename, _ in items:
+            self._remove_derived(filename)
+        if self.max_cache_size is not None:
+            self._evict_cache(self.max_cache_size)
+
+    def _remove_cache(self, filename: str):
+        """Remove previously fetched data (and its validators)"""
+        self._forget(filename)
+        if self._db is not None:
+            self._db.delete(filename)
+            return
+        path = self._cache_path(filename)
+        for stored_path in (path, f"{path}.meta"):
+            try:
+                os.remove(stored_path)
+            except FileNotFoundError:
+                pass
+
+    def _remove_derived(self, filename: str):
+        """Remove stored data derived from `filename`, now out-of-date"""
+        for pattern, derived_filename in _DERIVED_FILENAMES:
+            match = pattern.fullmatch(filename)
+            if match is not None:
+                self._remove_cache(derived_filename.format(*match.groups()))
+
+    def _touch_cache(self, filename: str):
+        """Mark previously fetched data as up-to-date"""
+        now = time.time()
+        if self._db is not None:
+            self._db.touch(filename)
+        else:
+            try:
+                os.utime(self._cache_path(filename), (now, now))
+            except OSError:
+                pass
+        with self._memory_lock:
+            entry = self._memory.get(filename)
+            if entry is not None:
+                self._memory[filename] = (entry[0], now, entry[2])
+
+    def _evict_cache(self, max_bytes: int):
+        """Remove the least recently fetched data, until under `max_bytes`"""
+        # a single scan at a time, concurrent writers skip the check
+        if not self._eviction_lock.acquire(blocking=False):
+            return
+        try:
+            self._evict_oldest(max_bytes)
+        finally:
+            self._eviction_lock.release()
+
+    def _evict_oldest(self, max_bytes: int):
+        """Remove data in the order it was fetched, until under `max_bytes`"""
+        if self._db is not None:
+            removed = self._db.evict(max_bytes)
+            if removed:
+                LOGGER.info(
+                    "Removed %d least recently stored entries.", removed
+                )
+            return
+
+        entries = []
+        for entry in os.scandir(self.data_dir):
+            if not entry.name.endswith(_CACHE_SUFFIXES):
+                continue
+            try:
+                if entry.is_file():
+                    entries.append((entry.path, entry.stat()))
+            except OSError:
+                # removed since the directory was listed
+                continue
+
+        total = sum(stat.st_size for _, stat in entries)
+        if total <= max_bytes:
+            return
+
+        entries.sort(key=lambda e: e[1].st_mtime)
+        removed = 0
+        for path, stat in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            removed += 1
+        LOGGER.info("Removed %d least recently fetched files.", removed)
+
     # ----------------------------------------------------------------------- #
     # Request
 
     def request_parse(self, match_id: int or str):
         """Submit a new parse request"""
-        LOGGER.info(f"Requesting parse for match {match_id}")
+        LOGGER.info("Requesting parse for match %s", match_id)
         url = f"/request/{match_id}"
         return self.post(url)
 
@@ -280,11 +1321,9 @@ class OpenDota:
     # ----------------------------------------------------------------------- #
     # Static Game Data (mirrored from the dotaconstants repository)
 
+    @_cached_endpoint("/constants", "constants.json")
     def get_constant_names(self, force: bool = False):
         """Get an array of available resources"""
-        url = "/constants"
-        filename = "constants.json"
-        return self.get(url, filename=filename, force=force)
 
     def get_constants(self, resource: str = None, force: bool = False):
         """
@@ -302,33 +1341,32 @@ class OpenDota:
             if not isinstance(resource, list):
                 LOGGER.error(
                     "`resources' must be a string or a list of strings, "
-                    f"not `{type(resource)}'"
+                    "not `%s'", type(resource)
                 )
                 return None
         else:
-            resource = self.get_constant_names(force=force)
+            if force or self._constant_names is None:
+                self._constant_names = self.get_constant_names(force=force)
+            resource = self._constant_names
+            if resource is None:
+                return None
 
-        constants = {}
-        for res in resource:
-            url = f"/constants/{res}"
-            filename = f"constants_{res}.json"
-            constants[res] = self.get(url, filename=filename, force=force)
-        return constants
+        specs = [
+            (f"/constants/{res}", f"constants_{res}.json", None)
+            for res in resource
+        ]
+        return dict(zip(resource, self._fetch_many(specs, force=force)))
 
     # ----------------------------------------------------------------------- #
     # Hero
 
+    @_cached_endpoint("/heroes", "heroes.json")
     def get_heroes(self, force: bool = False):
         """Get hero data"""
-        url = "/heroes"
-        filename = "heroes.json"
-        return self.get(url, filename=filename, force=force)
 
+    @_cached_endpoint("/heroStats", "hero_stats.json")
     def get_hero_stats(self, force: bool = False):
         """Get stats about hero performance in recent matches"""
-        url = "/heroStats"
-        filename = "hero_stats.json"
-        return self.get(url, filename=filename, force=force)
 
     def get_hero_benchmarks(self, hero_id: int or str, force: bool = False):
         """Get benchmarks for a hero"""
@@ -340,32 +1378,28 @@ class OpenDota:
     # ----------------------------------------------------------------------- #
     # Leagues
 
+    @_cached_endpoint("/leagues", "leagues.json")
     def get_leagues(self, force: bool = False):
         """Get a list of leagues"""
-        url = "/leagues"
-        filename = "leagues.json"
-        return self.get(url, filename=filename, force=force)
 
+    @_cached_endpoint("/leagues/{league_id}", "league_{league_id}.json")
     def get_league(self, league_id: int or str, force: bool = False):
         """Get data for a league"""
-        url = f"/leagues/{league_id}"
-        filename = f"league_{league_id}.json"
-        return self.get(url, filename=filename, force=force)
 
     # ----------------------------------------------------------------------- #
     # League Specific
 
+    @_cached_endpoint(
+        "/leagues/{league_id}/matches", "league_{league_id}_matches.json"
+    )
     def get_league_matches(self, league_id: int or str, force: bool = False):
         """Get matches from a league"""
-        url = f"/leagues/{league_id}/matches"
-        filename = f"league_{league_id}_matches.json"
-        return self.get(url, filename=filename, force=force)
 
+    @_cached_endpoint(
+        "/leagues/{league_id}/teams", "league_{league_id}_teams.json"
+    )
     def get_league_teams(self, league_id: int or str, force: bool = False):
         """Get teams from a league"""
-        url = f"/leagues/{league_id}/teams"
-        filename = f"league_{league_id}_teams.json"
-        return self.get(url, filename=filename, force=force)
 
     # ----------------------------------------------------------------------- #
     # Teams
@@ -375,28 +1409,34 @@ class OpenDota:
         url = "/teams"
         filename = "teams.json"
         teams = self.get(url, filename=filename, force=force)
-        for team in teams:
-            filename = f"team_{team['team_id']}.json"
-            path = os.path.join(self.data_dir, filename)
-
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(team, f, ensure_ascii=False)
+        if not teams:
+            return teams
+
+        # per-team data is stored once for every new list of teams
+        # (the marker is removed when the list is written again, but not
+        # when it is only revalidated)
+        if not force and self._is_cached(_TEAMS_STORED_FILENAME):
+            return teams
+
+        # encoded up front, as encoding holds the GIL
+        self._write_cache_many([
+            (f"team_{team['team_id']}.json", _dumps(team)) for team in teams
+        ])
+        self._write_cache(_TEAMS_STORED_FILENAME, _dumps(len(teams)))
         return teams
 
+    @_cached_endpoint("/teams/{team_id}", "team_{team_id}.json")
     def get_team(self, team_id: int or str, force: bool = False):
         """Get data for a team"""
-        url = f"/teams/{team_id}"
-        filename = f"team_{team_id}.json"
-        return self.get(url, filename=filename, force=force)
 
     # ----------------------------------------------------------------------- #
     # Team Specific
 
+    @_cached_endpoint(
+        "/teams/{team_id}/matches", "team_{team_id}_matches.json"
+    )
     def get_team_matches(self, team_id: int or str, force: bool = False):
         """Get matches for a team"""
-        url = f"/teams/{team_id}/matches"
-        filename = f"team_{team_id}_matches.json"
-        return self.get(url, filename=filename, force=force)
 
     def get_team_players(
         self,
@@ -417,20 +1457,16 @@ class OpenDota:
         else:
             return players
 
+    @_cached_endpoint("/teams/{team_id}/heroes", "team_{team_id}_heroes.json")
     def get_team_heroes(self, team_id: int or str, force: bool = False):
         """Get heroes for a team"""
-        url = f"/teams/{team_id}/heroes"
-        filename = f"team_{team_id}_heroes.json"
-        return self.get(url, filename=filename, force=force)
 
     # ----------------------------------------------------------------------- #
     # Matches
 
+    @_cached_endpoint("/matches/{match_id}", "match_{match_id}.json")
     def get_match(self, match_id: int or str, force: bool = False):
         """Get match data"""
-        url = f"/matches/{match_id}"
-        filename = f"match_{match_id}.json"
-        return self.get(url, filename=filename, force=force)
 
     def get_pro_matches(self, match_id: int or str = None, force: bool = False):
         """Get a list of pro matches"""
@@ -450,17 +1486,13 @@ class OpenDota:
     # ----------------------------------------------------------------------- #
     # Players
 
+    @_cached_endpoint("/players/{account_id}", "player_{account_id}.json")
     def get_player(self, account_id: int or str, force: bool = False):
         """Player data"""
-        url = f"/players/{account_id}"
-        filename = f"player_{account_id}.json"
-        return self.get(url, filename=filename, force=force)
 
+    @_cached_endpoint("/proPlayers", "pro_players.json")
     def get_pro_players(self, force: bool = False):
         """Get a list of pro players"""
-        url = "/proPlayers"
-        filename = "pro_players.json"
-        return self.get(url, filename=filename, force=force)
 
     # ----------------------------------------------------------------------- #
     # Player Specific
@@ -490,30 +1522,50 @@ class OpenDota:
         filename = f"player_{player_id}_matches.json"
         data = {"date": days}
         matches = self.get(url, filename=filename, data=data, force=force)
-        if request_parse:
-            for match in matches:
-                match_id = match["match_id"]
-                if match["version"] is None or match["version"] < 20:
-                    json_data = self.request_parse(match_id)
-                    LOGGER.info("Match ID:", match_id)
-                    LOGGER.info("Job ID:", json_data["job"]["jobId"])
+        if request_parse and matches:
+            match_ids = [
+                match["match_id"]
+                for match in matches
+                if match["version"] is None or match["version"] < 20
+            ]
+            # requests are submitted concurrently, throttled by the rate limit
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                results = executor.map(self.request_parse, match_ids)
+                for match_id, json_data in zip(match_ids, results):
+                    if json_data is None:
+                        continue
+                    LOGGER.info("Match ID: %s", match_id)
+                    LOGGER.info("Job ID: %s", json_data["job"]["jobId"])
         return matches
 
+    @_cached_endpoint(
+        "/players/{player_id}/ratings", "player_{player_id}_ratings.json"
+    )
     def get_player_ratings(self, player_id: int or str, force: bool = False):
         """Player rating history"""
-        url = f"/players/{player_id}/ratings"
-        filename = f"player_{player_id}_ratings.json"
-        return self.get(url, filename=filename, force=force)
 
+    @_cached_endpoint(
+        "/players/{player_id}/rankings", "player_{player_id}_rankings.json"
+    )
     def get_player_rankings(self, player_id: int or str, force: bool = False):
         """Player hero rankings"""
-        url = f"/players/{player_id}/rankings"
-        filename = f"player_{player_id}_rankings.json"
-        return self.get(url, filename=filename, force=force)
 
     # ----------------------------------------------------------------------- #
     # Search
 
+    def _get_derived(self, name: str, source: Any, build) -> Any:
+        """
+        Get the data (e.g. a search index) built from `source`
+
+        The data is rebuilt only when `source` is not the same object that
+        it was previously built from (e.g. after a forced fetch).
+        """
+        built_from, derived = self._derived.get(name, (None, None))
+        if built_from is not source:
+            derived = build(source)
+            self._derived[name] = (source, derived)
+        return derived
+
     def search_hero(
         self,
         search_key: str = None,
@@ -521,40 +1573,79 @@ class OpenDota:
         roles: List[str] = None
     ):
         """Search for a hero by name, attack type or roles"""
-        results = []
-        for hero in self.get_heroes():
-            conditions = []
-            if search_key is not None:
-                conditions.append(
-                    search_key.lower() in hero["localized_name"].lower()
-                )
-            if attack_type is not None:
-                conditions.append(attack_type.title() == hero["attack_type"])
-            if roles is not None:
-                if isinstance(roles, str):
-                    roles = [roles]
-                conditions.append(
-                    all([role.title() in hero["roles"] for role in roles])
-                )
-            if all(conditions):
-                results.append(hero)
-        return results
+        heroes = self.get_heroes()
+        index = self._get_derived(
+            "heroes",
+            heroes,
+            lambda heroes: [
+                (hero["localized_name"].lower(), hero) for hero in heroes
+            ]
+        )
+        by_attack_type, by_role = self._get_derived(
+            "hero_groups", heroes, _group_heroes
+        )
+
+        positions = None
+        if attack_type is not None:
+            positions = by_attack_type.get(attack_type.title(), set())
+        if roles is not None:
+            if isinstance(roles, str):
+                roles = [roles]
+            for role in roles:
+                role_positions = by_role.get(role.title(), set())
+                if positions is None:
+                    positions = role_positions
+                else:
+                    positions = positions & role_positions
+
+        candidates = index
+        if positions is not None:
+            candidates = [index[position] for position in sorted(positions)]
+
+        if search_key is None:
+            return [hero for _, hero in candidates]
+        search_key = search_key.lower()
+        return [
+            hero
+            for hero_name, hero in candidates
+            if search_key in hero_name
+        ]
 
     def search_league(self, search_key: str):
         """Search for a league"""
+        index = self._get_derived(
+            "leagues",
+            self.get_leagues(),
+            lambda leagues: [
+                ((league["name"] or "").lower(), league) for league in leagues
+            ]
+        )
+        search_key = search_key.lower()
         return [
             league
-            for league in self.get_leagues()
-            if search_key.lower() in league["name"].lower()
+            for league_name, league in index
+            if search_key in league_name
         ]
 
     def search_team(self, search_key: str):
         """Search for a team by name or tag"""
+        index = self._get_derived(
+            "teams",
+            self.get_teams(),
+            lambda teams: [
+                (
+                    (team["name"] or "").casefold(),
+                    (team["tag"] or "").casefold(),
+                    team
+                )
+                for team in teams
+            ]
+        )
+        search_key = search_key.casefold()
         return [
             team
-            for team in self.get_teams()
-            if search_key.lower() in team["name"].lower()
-            or search_key.lower() == team["tag"].lower()
+            for team_name, team_tag, team in index
+            if search_key in team_name or search_key == team_tag
         ]
 
     def search_player(self, search_key: str):
@@ -581,9 +1672,36 @@ class OpenDota:
             Dict:
                 Fantasy profiles of players from the specified match
         """
-        match = self.get_match(match_id, force=force)
+        # only the fields used here are stored for later calls,
+        # and are removed when the match data is fetched again
+        filename = _FANTASY_FILENAME.format(match_id)
+        match = None
+        if not force:
+            match = self._read_cache(filename)
+        if match is None:
+            full_match = self.get_match(match_id, force=force)
+            if full_match is None:
+                return None
+            match = {key: full_match[key] for key in _FANTASY_MATCH_FIELDS}
+            match['players'] = [
+                {key: player[key] for key in _FANTASY_PLAYER_FIELDS}
+                for player in full_match['players']
+            ]
+            content = _dumps(match)
+            self._write_cache(filename, content)
+            self._remember(filename, match, time.time(), len(content))
+
         match_fantasy = {}
 
+        # (parameter, extractor, base score, multiplier)
+        weights = [
+            (
+                param, extract,
+                self.fantasy.get(f'{param}_base', 0), self.fantasy[param]
+            )
+            for param, extract in _STAT_EXTRACTORS
+        ]
+
         for player in match['players']:
             player_id = player['account_id']
             player_slot = player['player_slot']
@@ -615,82 +1733,17 @@ class OpenDota:
                     'name': player_team['name'],
                     'tag': player_team['tag']
                 },
-                'fantasy': {
-                    'kills': {
-                        'value': player['kills']
-                    },
-                    'deaths': {
-                        'value': player['deaths']
-                    },
-                    'assists': {
-                        'value': player['assists']
-                    },
-                    'last_hits': {
-                        'value': player['last_hits'] + player['denies'],
-                    },
-                    'gold_per_min': {
-                        'value': player['gold_per_min']
-                    },
-                    'xp_per_min': {
-                        'value': player['xp_per_min']
-                    },
-                    'tower_kills': {
-                        'value': player['tower_kills']
-                    },
-                    'tower_damage': {
-                        'value': player['tower_damage']
-                    },
-                    'hero_damage': {
-                        'value': player['hero_damage']
-                    },
-                    'courier_kills': {
-                        'value': player['courier_kills']
-                    },
-                    'observer_kills': {
-                        'value': player['observer_kills']
-                    },
-                    'sentry_kills': {
-                        'value': player['sentry_kills']
-                    },
-                    'roshan_kills': {
-                        'value': player['roshan_kills']
-                    },
-                    'teamfight': {
-                        'value': player['teamfight_participation']
-                    },
-                    'observer_placed': {
-                        'value': player['obs_placed']
-                    },
-                    'sentry_placed': {
-                        'value': player['sen_placed']
-                    },
-                    'camps_stacked': {
-                        'value': player['camps_stacked']
-                    },
-                    'runes_grabbed': {
-                        'value': player['rune_pickups']
-                    },
-                    'first_blood': {
-                        'value': int(player['firstblood_claimed'])
-                    },
-                    'stuns': {
-                        'value': player['stuns']
-                    },
-                    'hero_healing': {
-                        'value': player['hero_healing']
-                    }
-                },
             }
 
-            for param, obj in player_fantasy['fantasy'].items():
-                obj['score'] = (
-                    self.fantasy.get(f'{param}_base', 0) +
-                    self.fantasy[param] * obj['value']
-                )
-            player_fantasy['total_score'] = sum([
-                obj['score']
-                for obj in player_fantasy['fantasy'].values()
-            ])
+            fantasy = {}
+            total_score = 0
+            for param, extract, base, multiplier in weights:
+                value = extract(player)
+                score = base + multiplier * value
+                fantasy[param] = {'value': value, 'score': score}
+                total_score += score
+            player_fantasy['fantasy'] = fantasy
+            player_fantasy['total_score'] = total_score
             match_fantasy[player_id] = player_fantasy
 
         return match_fantasy
@@ -712,14 +1765,12 @@ class OpenDota:
         filename = "schema.json"
         schema = self.get(url, filename=filename, force=force)
 
+        tables = self._get_derived("schema", schema, _group_schema)
+
         if table_name is None:
-            return sorted(set([field["table_name"] for field in schema]))
+            return sorted(tables)
         else:
-            return {
-                field["column_name"]: field["data_type"]
-                for field in schema
-                if table_name == field["table_name"]
-            }
+            return dict(tables.get(table_name, {}))
 
     def explorer(self, sql: str, debug: bool = False):
         """Submit arbitrary PostgreSQL queries to the database"""
@@ -758,8 +1809,14 @@ class OpenDota:
 
         if frequency <= FREQ_MEDIUM:
             heroes = self.get_heroes()
-            for hero in heroes:
-                self.get_hero_benchmarks(hero["id"], force=True)
+            self._fetch_many([
+                (
+                    "/benchmarks",
+                    f"benchmarks_{hero['id']}.json",
+                    {"hero_id": hero["id"]}
+                )
+                for hero in heroes
+            ], force=True)
 
         if frequency <= FREQ_LOW:
             self.get_constants(force=True)
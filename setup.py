@@ -12,6 +12,12 @@ with open('HISTORY.rst') as history_file:
 
 requirements = ['requests', 'fire']
 
+extras_requirements = {
+    'fast': ['orjson'],
+    'compression': ['brotli', 'zstandard'],
+    'http2': ['httpx[http2]'],
+}
+
 test_requirements = ['pytest>=3', ]
 
 setup(
@@ -39,6 +45,7 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
@@ -2,6 +2,11 @@
 
 """Tests for `opendota` package."""
 
+import json
+import os
+import threading
+import time
+
 import pytest
 
 
@@ -22,3 +27,591 @@ def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
     # from bs4 import BeautifulSoup
     # assert 'GitHub' in BeautifulSoup(response.content).title.string
+
+
+class FakeResponse:
+    """Minimal stand-in for a `requests` response"""
+
+    def __init__(self, obj=None, status_code=200, headers=None):
+        self.content = b"" if obj is None else json.dumps(obj).encode()
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Session serving canned responses, and recording every call"""
+
+    def __init__(self):
+        self.routes = {}
+        self.calls = []
+        self.params = []
+        self.headers = {}
+        self._lock = threading.Lock()
+
+    def respond(self, url, headers):
+        with self._lock:
+            self.calls.append((url, headers))
+        path = url.split(opendota.OPENDOTA_API_URL, 1)[1]
+        response = self.routes[path]
+        if callable(response):
+            response = response(headers or {})
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.params.append(params)
+        return self.respond(url, headers)
+
+    def post(self, url, data=None, timeout=None):
+        return self.respond(url, None)
+
+
+@pytest.fixture
+def session():
+    """Fake session shared by the API fixtures"""
+    return FakeSession()
+
+
+@pytest.fixture(params=[opendota.CACHE_FILE, opendota.CACHE_SQLITE])
+def api(request, tmp_path, session):
+    """OpenDota instance (with either store) using the fake session"""
+    od = opendota.OpenDota(data_dir=str(tmp_path), cache=request.param)
+    od._session = session
+    od._bucket = opendota._TokenBucket(capacity=1000, rate=1000)
+    return od
+
+
+def age(api, filename, seconds):
+    """Make previously fetched data older by `seconds`"""
+    mtime = time.time() - seconds
+    if api._db is not None:
+        with api._db._db:
+            api._db._db.execute(
+                "UPDATE kv SET mtime = ? WHERE k = ?", (mtime, filename)
+            )
+    else:
+        os.utime(api._cache_path(filename), (mtime, mtime))
+    forget(api)
+
+
+def forget(api):
+    """Drop everything kept in memory"""
+    for filename in list(api._memory):
+        api._forget(filename)
+
+
+###############################################################################
+# Store Backends
+
+
+def test_sqlite_cache_save_load(tmp_path):
+    store = opendota._SQLiteCache(str(tmp_path / "cache.sqlite"))
+    store.save("a.json", b"[1]", etag="v1")
+    content, mtime = store.load("a.json")
+    assert content == b"[1]"
+    assert store.mtime("a.json") == mtime
+    assert store.load_meta("a.json") == {"etag": "v1", "last_modified": None}
+    assert store.load("missing.json") is None
+    assert store.load_meta("missing.json") == {}
+
+
+def test_sqlite_cache_migration(tmp_path):
+    (tmp_path / "a.json").write_bytes(b'{"a": 1}')
+    (tmp_path / "a.json.meta").write_bytes(b'{"etag": "v1"}')
+    (tmp_path / "notes.txt").write_bytes(b"not imported")
+    store = opendota._SQLiteCache(str(tmp_path / "cache.sqlite"))
+    assert store.load("a.json")[0] == b'{"a": 1}'
+    assert store.load_meta("a.json")["etag"] == "v1"
+    assert store.load("notes.txt") is None
+
+
+def test_sqlite_cache_save_many_and_evict(tmp_path):
+    store = opendota._SQLiteCache(str(tmp_path / "cache.sqlite"))
+    store.save("old.json", b"x" * 100)
+    with store._db:
+        store._db.execute("UPDATE kv SET mtime = 0 WHERE k = 'old.json'")
+    store.save_many([("a.json", b"x" * 100), ("b.json", b"x" * 100)])
+    assert store.evict(250) == 1
+    assert store.load("old.json") is None
+    assert store.load("a.json") is not None
+    assert store.load("b.json") is not None
+
+
+###############################################################################
+# Rate Limiting
+
+
+def test_token_bucket(monkeypatch):
+    waits = []
+    monkeypatch.setattr(opendota.time, "sleep", waits.append)
+    bucket = opendota._TokenBucket(capacity=2, rate=1)
+    bucket.acquire()
+    bucket.acquire()
+    assert waits == []
+    bucket.acquire()
+    assert len(waits) == 1 and 0 < waits[0] <= 1
+    bucket.penalize()
+    bucket.acquire()
+    assert waits[-1] >= 1
+
+
+@pytest.mark.parametrize("delay", [0, 3, 10, 60])
+def test_burst_does_not_grow_with_delay(tmp_path, delay):
+    api = opendota.OpenDota(data_dir=str(tmp_path), delay=delay)
+    assert api._bucket.capacity == opendota.BURST_SIZE
+    assert api._bucket.rate == 1 / max(delay, 1)
+
+
+###############################################################################
+# Session
+
+
+def test_http2_session(tmp_path, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    api = opendota.OpenDota(data_dir=str(tmp_path), http2=True)
+    assert isinstance(api._session, httpx.Client)
+
+    def handler(request):
+        if request.method == "POST":
+            return httpx.Response(200, json={"job": {"jobId": 1}})
+        assert request.url.params["date"] == "7"
+        return httpx.Response(200, json=[{"match_id": 1}])
+
+    api._session = httpx.Client(transport=httpx.MockTransport(handler))
+    api._bucket = opendota._TokenBucket(capacity=1000, rate=1000)
+    assert api.get(
+        "/players/1/matches", data={"date": 7}
+    ) == [{"match_id": 1}]
+    assert api.request_parse(1) == {"job": {"jobId": 1}}
+
+    monkeypatch.setattr(opendota, "httpx", None)
+    api = opendota.OpenDota(data_dir=str(tmp_path), http2=True)
+    assert isinstance(api._session, opendota.requests.Session)
+
+
+###############################################################################
+# Request
+
+
+def test_request_params(api, session):
+    session.routes["/explorer"] = FakeResponse({"rows": []})
+    api.api_key = "key"
+    data = {"sql": "SELECT 1"}
+    api.get("/explorer", data=data)
+    assert session.params[-1] == {"sql": "SELECT 1", "api_key": "key"}
+    assert data == {"sql": "SELECT 1"}
+
+
+def test_request_cache_hit(api, session):
+    session.routes["/heroes"] = FakeResponse([{"id": 1}])
+    assert api.get_heroes() == [{"id": 1}]
+    forget(api)
+    assert api.get_heroes() == [{"id": 1}]
+    assert len(session.calls) == 1
+
+
+def test_request_results_are_shared(api, session):
+    session.routes["/heroes"] = FakeResponse([{"id": 2}, {"id": 1}])
+    heroes = api.get_heroes()
+    assert api.get_heroes() is heroes
+    sorted_heroes = sorted(heroes, key=lambda hero: hero["id"])
+    assert api.get_heroes() == [{"id": 2}, {"id": 1}]
+    assert sorted_heroes == [{"id": 1}, {"id": 2}]
+
+
+def test_request_error_is_not_stored(api, session):
+    session.routes["/heroes"] = FakeResponse({"error": "rate limit"}, 429)
+    assert api.get_heroes() is None
+    assert not api._is_cached("heroes.json")
+
+
+def test_request_conditional(api, session):
+    def heroes(headers):
+        if headers.get("If-None-Match") == "v1":
+            return FakeResponse(status_code=304)
+        return FakeResponse([{"id": 1}], headers={"ETag": "v1"})
+
+    session.routes["/heroes"] = heroes
+    heroes_data = api.get_heroes()
+    mtime = api._cache_mtime("heroes.json")
+    time.sleep(0.01)
+    assert api.get_heroes(force=True) == heroes_data
+    assert session.calls[-1][1] == {"If-None-Match": "v1"}
+    assert api._cache_mtime("heroes.json") > mtime
+
+
+def test_request_ttl(api, session):
+    session.routes["/teams"] = FakeResponse([{"team_id": 1}])
+    api.get("/teams", filename="teams.json", ttl=60)
+    age(api, "teams.json", 120)
+    api.get("/teams", filename="teams.json", ttl=60)
+    assert len(session.calls) == 2
+
+
+def test_memory_cache_limits(api, session, monkeypatch):
+    monkeypatch.setattr(opendota, "MEMORY_CACHE_BYTES", 100)
+    session.routes["/heroes"] = FakeResponse([{"id": i} for i in range(50)])
+    session.routes["/teams"] = FakeResponse([{"team_id": 1}])
+    session.routes["/leagues"] = FakeResponse([{"leagueid": 1}])
+    api.get_heroes()
+    assert "heroes.json" not in api._memory
+    api.get_teams()
+    api.get_leagues()
+    assert list(api._memory) == ["teams.json", "leagues.json"]
+    api._write_cache("teams.json", b"[]")
+    assert api._memory_bytes == len(b'[{"leagueid": 1}]')
+
+
+def test_memory_cache_limits_decompressed_size(api, session, monkeypatch):
+    pytest.importorskip("zstandard")
+    monkeypatch.setattr(opendota, "MEMORY_CACHE_BYTES", 100)
+    api.compress = True
+    session.routes["/heroes"] = FakeResponse([{"id": 1}] * 50)
+    api.get_heroes()
+    assert "heroes.json" not in api._memory
+    assert api.get_heroes() == [{"id": 1}] * 50
+    assert "heroes.json" not in api._memory
+    assert len(session.calls) == 1
+
+
+def test_memory_cache_disabled(tmp_path, session):
+    api = opendota.OpenDota(data_dir=str(tmp_path), memory_cache_size=0)
+    api._session = session
+    session.routes["/heroes"] = FakeResponse([{"id": 1}])
+    assert api.get_heroes() == api.get_heroes() == [{"id": 1}]
+    assert not api._memory and api._memory_bytes == 0
+    assert len(session.calls) == 1
+
+
+def test_request_without_parse(api, session):
+    session.routes["/heroes"] = FakeResponse([{"id": 1}])
+    assert api.get("/heroes", filename="heroes.json", parse=False) is None
+    assert api._read_cache("heroes.json") == [{"id": 1}]
+    assert len(session.calls) == 1
+
+
+def test_request_without_parse_does_not_load(api, session, monkeypatch):
+    def heroes(headers):
+        if headers.get("If-None-Match") == "v1":
+            return FakeResponse(status_code=304)
+        return FakeResponse([{"id": 1}], headers={"ETag": "v1"})
+
+    session.routes["/heroes"] = heroes
+    api.get("/heroes", filename="heroes.json", parse=False, ttl=60)
+    reads = []
+    monkeypatch.setattr(api, "_read_cache", reads.append)
+    api.get("/heroes", filename="heroes.json", parse=False, ttl=60)
+    assert len(session.calls) == 1
+    age(api, "heroes.json", 120)
+    api.get("/heroes", filename="heroes.json", parse=False, ttl=60)
+    api.get("/heroes", filename="heroes.json", parse=False, force=True)
+    assert len(session.calls) == 3
+    assert reads == []
+    assert api._cache_mtime("heroes.json") > time.time() - 60
+
+
+def test_request_coalescing(api, session):
+    def heroes(headers):
+        time.sleep(0.1)
+        return FakeResponse([{"id": 1}])
+
+    session.routes["/heroes"] = heroes
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(api.get_heroes()))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [[{"id": 1}]] * 4
+    assert len(session.calls) == 1
+
+
+def test_cached_endpoint(api, session):
+    session.routes["/teams/7"] = FakeResponse({"team_id": 7})
+    assert api.get_team(7) == {"team_id": 7}
+    assert api.get_team(team_id=7) == {"team_id": 7}
+    assert api._is_cached("team_7.json")
+    assert len(session.calls) == 1
+    api.get_team(7, True)
+    api.get_team(7, force=True)
+    assert len(session.calls) == 3
+    assert api.get_team.__name__ == "get_team"
+    assert api.get_team.__doc__ == "Get data for a team"
+
+
+def test_get_constants_fetches_concurrently(api, session):
+    names = ["heroes", "items", "abilities"]
+    barrier = threading.Barrier(len(names), timeout=5)
+
+    def constant(name):
+        def respond(headers):
+            barrier.wait()
+            return FakeResponse({"name": name})
+        return respond
+
+    session.routes["/constants"] = FakeResponse(names)
+    for name in names:
+        session.routes[f"/constants/{name}"] = constant(name)
+    assert api.get_constants() == {name: {"name": name} for name in names}
+    assert api.get_constants("items") == {"items": {"name": "items"}}
+    assert len(session.calls) == 1 + len(names)
+
+
+def test_constant_names_are_kept(api, session, monkeypatch):
+    session.routes["/constants"] = FakeResponse(["items"])
+    session.routes["/constants/items"] = FakeResponse({"1": "blink"})
+    lookups = []
+    get_constant_names = api.get_constant_names
+    monkeypatch.setattr(
+        api, "get_constant_names",
+        lambda force=False: lookups.append(force) or get_constant_names(force)
+    )
+    api.get_constants()
+    api.get_constants()
+    assert lookups == [False]
+
+    session.routes["/constants"] = FakeResponse(["items", "heroes"])
+    session.routes["/constants/heroes"] = FakeResponse({"1": "axe"})
+    assert sorted(api.get_constants(force=True)) == ["heroes", "items"]
+    assert lookups == [False, True]
+
+
+def test_update_data_fetches_benchmarks(api, session):
+    session.routes["/teams"] = FakeResponse([])
+    session.routes["/heroes"] = FakeResponse([{"id": 1}, {"id": 2}])
+    session.routes["/benchmarks"] = FakeResponse({"result": {}})
+    api.update_data(opendota.FREQ_MEDIUM)
+    assert sorted(
+        params["hero_id"] for params in session.params if "hero_id" in params
+    ) == [1, 2]
+    assert api._is_cached("benchmarks_1.json")
+    assert api._is_cached("benchmarks_2.json")
+
+
+def test_player_matches_request_parse(api, session):
+    session.routes["/players/1/matches"] = FakeResponse([
+        {"match_id": 10, "version": None},
+        {"match_id": 11, "version": 21},
+        {"match_id": 12, "version": 19},
+    ])
+    barrier = threading.Barrier(2, timeout=5)
+
+    def job(job_id, status_code=200):
+        def respond(headers):
+            barrier.wait()
+            if status_code != 200:
+                return FakeResponse({"error": "rate limit"}, status_code)
+            return FakeResponse({"job": {"jobId": job_id}})
+        return respond
+
+    session.routes["/request/10"] = job(100)
+    session.routes["/request/12"] = job(None, 429)
+    matches = api.get_player_matches(1, request_parse=True)
+    assert len(matches) == 3
+    assert sorted(
+        url.rsplit("/", 1)[1] for url, _ in session.calls if "request" in url
+    ) == ["10", "12"]
+
+
+def test_large_files_are_memory_mapped(tmp_path, monkeypatch):
+    if opendota.orjson is None and opendota.msgspec is None:
+        pytest.skip("requires orjson or msgspec")
+    monkeypatch.setattr(opendota, "_MMAP_THRESHOLD", 0)
+    mapped = []
+    mmap = opendota.mmap.mmap
+    monkeypatch.setattr(
+        opendota.mmap, "mmap",
+        lambda *args, **kwargs: mapped.append(args) or mmap(*args, **kwargs)
+    )
+    api = opendota.OpenDota(data_dir=str(tmp_path))
+    api._write_cache("heroes.json", b'[{"id": 1}]')
+    forget(api)
+    assert api._read_cache("heroes.json") == [{"id": 1}]
+    assert len(mapped) == 1
+    assert api._memory["heroes.json"][2] == len(b'[{"id": 1}]')
+
+
+def test_compression_migration(tmp_path, session):
+    pytest.importorskip("zstandard")
+    (tmp_path / "heroes.json").write_bytes(b'[{"id": 1}]')
+    (tmp_path / "heroes.json.meta").write_bytes(b'{"etag": "v1"}')
+    api = opendota.OpenDota(data_dir=str(tmp_path), compress=True)
+    api._session = session
+    assert api.get_heroes() == [{"id": 1}]
+    assert session.calls == []
+    assert sorted(os.listdir(str(tmp_path))) == [
+        "heroes.json.zst", "heroes.json.zst.meta"
+    ]
+    assert api._read_cache_meta("heroes.json")["etag"] == "v1"
+
+
+def test_validators_are_replaced_with_content(api, session):
+    def team(headers):
+        if headers.get("If-None-Match") == "v1":
+            return FakeResponse(status_code=304)
+        return FakeResponse(
+            {"team_id": 1, "name": "Team 1", "rating": 1000},
+            headers={"ETag": "v1"}
+        )
+
+    session.routes["/teams/1"] = team
+    session.routes["/teams"] = FakeResponse(
+        [{"team_id": 1, "name": "Team 1", "tag": None}]
+    )
+    api.get_team(1)
+    api.get_teams(force=True)
+    assert api._read_cache_meta("team_1.json").get("etag") is None
+    assert api.get_team(1, force=True)["rating"] == 1000
+    assert session.calls[-1][1] == {}
+
+
+def test_get_teams_stores_teams(api, session):
+    session.routes["/teams"] = FakeResponse(
+        [{"team_id": i, "name": f"Team {i}", "tag": None} for i in range(5)]
+    )
+    api.get_teams()
+    assert api.get_team(3) == {"team_id": 3, "name": "Team 3", "tag": None}
+    assert [team["team_id"] for team in api.search_team("team 2")] == [2]
+    assert len(session.calls) == 1
+
+
+def test_derived_data_is_rebuilt(api, session):
+    session.routes["/heroes"] = FakeResponse([
+        {"localized_name": "Axe", "attack_type": "Melee",
+         "roles": ["Initiator"]},
+        {"localized_name": "Lina", "attack_type": "Ranged",
+         "roles": ["Nuker"]},
+    ])
+    session.routes["/schema"] = FakeResponse([
+        {"table_name": "heroes", "column_name": "id", "data_type": "integer"},
+    ])
+    assert [hero["localized_name"] for hero in api.search_hero(
+        attack_type="ranged"
+    )] == ["Lina"]
+    assert api.get_schema() == ["heroes"]
+
+    session.routes["/heroes"] = FakeResponse([
+        {"localized_name": "Lion", "attack_type": "Ranged",
+         "roles": ["Nuker"]},
+    ])
+    session.routes["/schema"] = FakeResponse([
+        {"table_name": "teams", "column_name": "id", "data_type": "integer"},
+    ])
+    api.get_heroes(force=True)
+    api.get_schema(force=True)
+    assert [hero["localized_name"] for hero in api.search_hero(
+        roles="nuker"
+    )] == ["Lion"]
+    assert api.get_schema("teams") == {"id": "integer"}
+
+
+def test_get_teams_stores_teams_once(api, session, monkeypatch):
+    def teams(headers):
+        if headers.get("If-None-Match") == "v1":
+            return FakeResponse(status_code=304)
+        return FakeResponse(
+            [{"team_id": 1, "name": "Team 1", "tag": None}],
+            headers={"ETag": "v1"}
+        )
+
+    session.routes["/teams"] = teams
+    writes = []
+    write_cache_many = api._write_cache_many
+    monkeypatch.setattr(
+        api, "_write_cache_many",
+        lambda items: writes.append(items) or write_cache_many(items)
+    )
+    api.get_teams()
+    assert len(writes) == 1
+
+    # expired list of teams, which has not been modified
+    age(api, "teams.json", 2 * 24 * 60 * 60)
+    api.get_teams()
+    assert session.calls[-1][1] == {"If-None-Match": "v1"}
+    assert len(writes) == 1
+
+    session.routes["/teams"] = FakeResponse(
+        [{"team_id": 1, "name": "Team One", "tag": None}]
+    )
+    age(api, "teams.json", 2 * 24 * 60 * 60)
+    api.get_teams()
+    assert len(writes) == 2
+    assert api.get_team(1)["name"] == "Team One"
+
+
+def test_concurrent_eviction(api, session, monkeypatch):
+    monkeypatch.setattr(opendota, "EVICTION_INTERVAL", 1)
+    api.max_cache_size = 20000
+    session.routes["/teams"] = FakeResponse(
+        [{"team_id": i, "name": f"Team {i}", "tag": None} for i in range(3000)]
+    )
+    for _ in range(3):
+        api.get_teams(force=True)
+    if api._db is None:
+        assert len(os.listdir(api.data_dir)) < 3000
+
+
+def test_eviction_removes_oldest(api):
+    for team_id in range(5):
+        filename = f"team_{team_id}.json"
+        api._write_cache(filename, b"x" * 100)
+        age(api, filename, 100 - team_id)
+    api._evict_cache(250)
+    assert [
+        api._is_cached(f"team_{team_id}.json") for team_id in range(5)
+    ] == [False, False, False, True, True]
+
+
+@pytest.mark.parametrize("reply", [
+    ConnectionError("offline"),
+    FakeResponse({"error": "rate limit"}, 429),
+])
+def test_expired_data_is_used_if_unavailable(api, session, reply):
+    teams = [{"team_id": 1, "name": "Team A", "tag": "A"}]
+    session.routes["/teams"] = FakeResponse(teams)
+    api.get_teams()
+    age(api, "teams.json", 2 * 24 * 60 * 60)
+    session.routes["/teams"] = reply
+    assert api.get_teams() == teams
+    assert api.search_team("a") == teams
+
+
+###############################################################################
+# Fantasy
+
+
+def fake_match(kills):
+    player = {field: 0 for field in opendota._FANTASY_PLAYER_FIELDS}
+    player.update(account_id=1, player_slot=0, name="A", kills=kills)
+    return {
+        "match_id": 5, "series_id": 0, "series_type": 0,
+        "radiant_win": True,
+        "radiant_team": {"team_id": 1, "name": "A", "tag": "A"},
+        "dire_team": {"team_id": 2, "name": "B", "tag": "B"},
+        "players": [player],
+        "replay_url": "not needed for fantasy points",
+    }
+
+
+def test_match_fantasy_projection(api, session, monkeypatch):
+    session.routes["/matches/5"] = FakeResponse(fake_match(kills=1))
+    fantasy = api.get_match_fantasy(5)
+    assert fantasy[1]["fantasy"]["kills"]["value"] == 1
+    assert "replay_url" not in api._read_cache("match_5_fantasy.json")
+
+    forget(api)
+    assert api.get_match_fantasy(5) == fantasy
+    assert len(session.calls) == 1
+
+    # the match is fetched again, e.g. after it was parsed,
+    # with the same modification time as the stored fields
+    monkeypatch.setattr(opendota.time, "time", lambda: 1000.0)
+    session.routes["/matches/5"] = FakeResponse(fake_match(kills=9))
+    api.get_match(5, force=True)
+    fantasy = api.get_match_fantasy(5)
+    assert fantasy[1]["fantasy"]["kills"]["value"] == 9